@@ -1,223 +1,592 @@
 #!/usr/bin/env python3
 
+import heapq
 import json
+import mmap
 import os
+import sys
+import time
+from dataclasses import dataclass, fields
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj, pretty=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj, pretty=False):
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
-DATA_FILE = os.path.join(DATA_DIR, "grievances.json")
+DATA_FILE = os.path.join(DATA_DIR, "grievances.jsonl")
+LEGACY_DATA_FILE = os.path.join(DATA_DIR, "grievances.json")
+EXPORT_FILE = os.path.join(DATA_DIR, "grievances_export.json")
+COMPACT_RATIO = 2
+BUFFER_SIZE = 64 * 1024
+LIST_LIMIT = 50
+
+
+_STORAGE_READY = False
 
 
 def ensure_storage():
+    global _STORAGE_READY
+    if _STORAGE_READY:
+        return
     os.makedirs(DATA_DIR, exist_ok=True)
     if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=2)
+        save_grievances(load_legacy_grievances())
+        if os.path.exists(LEGACY_DATA_FILE):
+            os.replace(LEGACY_DATA_FILE, LEGACY_DATA_FILE + ".imported")
+    _STORAGE_READY = True
 
 
-def load_grievances():
+def with_storage(func, *args):
+    global _STORAGE_READY
     ensure_storage()
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
+    try:
+        return func(*args)
+    except FileNotFoundError:
+        _STORAGE_READY = False
+        ensure_storage()
+        return func(*args)
+
+
+def load_legacy_grievances():
+    if not os.path.exists(LEGACY_DATA_FILE):
+        return []
+    with open(LEGACY_DATA_FILE, "rb", buffering=BUFFER_SIZE) as f:
         try:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-            return []
-        except json.JSONDecodeError:
-            return []
-
-
-def save_grievances(grievances):
-    ensure_storage()
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(grievances, f, indent=2)
+            data = json_loads(f.read())
+        except ValueError:
+            raise SystemExit(f"Error: {LEGACY_DATA_FILE} is not valid JSON.")
+    if not isinstance(data, list):
+        raise SystemExit(f"Error: {LEGACY_DATA_FILE} does not contain a list of grievances.")
+    grievances = []
+    for item_no, item in enumerate(data, 1):
+        try:
+            grievances.append(Grievance.from_dict(item))
+        except ValueError as e:
+            raise SystemExit(
+                f"Error: {LEGACY_DATA_FILE} item {item_no} is not a valid grievance record: {e}."
+            )
+    return grievances
+
+
+@dataclass(slots=True)
+class Grievance:
+    id: int
+    title: str = ""
+    description: str = ""
+    author: str = ""
+    status: str = "open"
+    upvotes: int = 0
+    downvotes: int = 0
+    score: int | None = None
+    created_at: int = 0
+    extra: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError("expected an object")
+        if "id" not in data:
+            raise ValueError("id is required")
+        known = {k: v for k, v in data.items() if k in FIELDS}
+        extra = {k: v for k, v in data.items() if k not in FIELDS}
+        return cls(**known, extra=extra or None)
+
+    def __post_init__(self):
+        for name in ("title", "description", "author", "status"):
+            if not isinstance(getattr(self, name), str):
+                raise ValueError(f"{name} must be a string")
+        for name in ("id", "upvotes", "downvotes"):
+            if type(getattr(self, name)) is not int:
+                raise ValueError(f"{name} must be an integer")
+        if self.score is None:
+            self.score = self.upvotes - self.downvotes
+        elif type(self.score) is not int:
+            raise ValueError("score must be an integer")
+        if isinstance(self.created_at, str):
+            self.created_at = parse_timestamp(self.created_at)
+        elif type(self.created_at) is not int:
+            raise ValueError("created_at must be an integer or a date string")
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+COLUMNS = tuple(field.name for field in fields(Grievance))
+FIELDS = tuple(name for name in COLUMNS if name != "extra")
+
+
+def apply_record(records, op):
+    kind = op.get("op")
+    if kind == "add":
+        data = dict(op)
+        del data["op"]
+        grievance = Grievance.from_dict(data)
+        records[grievance.id] = grievance
+        return
+    if kind not in ("vote", "resolve", "delete"):
+        raise ValueError(f"unknown op {kind!r}")
+    grievance_id = op.get("id")
+    if type(grievance_id) is not int:
+        raise ValueError("id must be an integer")
+    if kind == "vote" and op.get("vote") not in _VOTES:
+        raise ValueError("vote must be 'up' or 'down'")
+    grievance = records.get(grievance_id)
+    if grievance is None:
+        return
+    if kind == "vote":
+        if op.get("vote") == "up":
+            grievance.upvotes += 1
+            grievance.score += 1
+        else:
+            grievance.downvotes += 1
+            grievance.score -= 1
+    elif kind == "resolve":
+        grievance.status = "resolved"
+    elif kind == "delete":
+        del records[grievance.id]
+
+
+def parse_timestamp(text):
+    try:
+        return int(datetime.fromisoformat(text).timestamp()) * 1_000_000_000
+    except ValueError:
+        return 0
+
+
+def format_timestamp(ns):
+    return datetime.fromtimestamp(ns // 1_000_000_000).isoformat(timespec="seconds")
+
+
+def read_log():
+    records = {}
+    op_count = 0
+    end = 0
+    torn = False
+    unterminated = False
+    with open(DATA_FILE, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return records, op_count
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line_no, line in enumerate(iter(mm.readline, b""), 1):
+                unterminated = not line.endswith(b"\n")
+                if line.isspace():
+                    end += len(line)
+                    continue
+                try:
+                    op = json_loads(line)
+                except ValueError:
+                    if unterminated:
+                        torn = True
+                        break
+                    raise SystemExit(f"Error: {DATA_FILE} line {line_no} is not valid JSON.")
+                if not isinstance(op, dict):
+                    if unterminated:
+                        torn = True
+                        break
+                    raise SystemExit(f"Error: {DATA_FILE} line {line_no} is not a JSON object.")
+                end += len(line)
+                op_count += 1
+                try:
+                    apply_record(records, op)
+                except ValueError as e:
+                    raise SystemExit(
+                        f"Error: {DATA_FILE} line {line_no} is not a valid grievance record: {e}."
+                    )
+    if torn:
+        os.truncate(DATA_FILE, end)
+    elif unterminated:
+        with open(DATA_FILE, "ab") as f:
+            f.write(b"\n")
+    return records, op_count
+
+
+def _quick_contains_id(buf, grievance_id):
+    return (
+        buf.find(b'"id":%d' % grievance_id) != -1
+        or buf.find(b'"id": %d' % grievance_id) != -1
+    )
 
 
-def generate_next_id(grievances):
-    if not grievances:
-        return 1
-    return max(g.get("id", 0) for g in grievances) + 1
+def file_contains_id(grievance_id):
+    with open(DATA_FILE, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _quick_contains_id(mm, grievance_id)
 
 
-def find_grievance(grievances, grievance_id):
-    for grievance in grievances:
-        if grievance.get("id") == grievance_id:
-            return grievance
-    return None
+def append_records(ops):
+    with open(DATA_FILE, "ab") as f:
+        f.write(b"".join(json_dumps(op) + b"\n" for op in ops))
+        f.flush()
+        os.fsync(f.fileno())
 
 
-def add_grievance(title, description, author):
-    grievances = load_grievances()
+def save_grievances(grievances):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp = DATA_FILE + ".tmp"
+    with open(tmp, "wb", buffering=BUFFER_SIZE) as f:
+        for grievance in grievances:
+            f.write(json_dumps({"op": "add", **grievance.to_dict()}) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, DATA_FILE)
+
+
+def file_state():
+    stat = os.stat(DATA_FILE)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Store:
+    def __init__(self):
+        self.columns = {field: [] for field in COLUMNS}
+        self.index = {}
+        self.by_status = {"open": set(), "resolved": set()}
+        self.next_id = 1
+        self.pending = []
+        self.dirty = False
+        self.mtime = None
+        self.size = None
+        self.op_count = 0
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def is_stale(self):
+        return with_storage(file_state) != (self.mtime, self.size)
+
+    def load(self):
+        if not self.is_stale():
+            return
+        records, self.op_count = with_storage(read_log)
+        grievances = records.values()
+        self.columns = {field: [getattr(g, field) for g in grievances] for field in COLUMNS}
+        ids = self.columns["id"]
+        self.index = {gid: row for row, gid in enumerate(ids)}
+        self.by_status = {"open": set(), "resolved": set()}
+        for gid, status in zip(ids, self.columns["status"]):
+            self.by_status.setdefault(status, set()).add(gid)
+        self.next_id = max(ids, default=0) + 1
+        self.mtime, self.size = file_state()
+
+    def row(self, row):
+        return Grievance(*(column[row] for column in self.columns.values()))
+
+    def rows(self):
+        for values in zip(*self.columns.values()):
+            yield Grievance(*values)
+
+    def add(self, grievance):
+        self.index[grievance.id] = len(self)
+        for field, column in self.columns.items():
+            column.append(getattr(grievance, field))
+        self.by_status.setdefault(grievance.status, set()).add(grievance.id)
+        self.next_id = max(self.next_id, grievance.id + 1)
+
+    def set_status(self, row, status):
+        grievance_id = self.columns["id"][row]
+        statuses = self.columns["status"]
+        self.by_status[statuses[row]].discard(grievance_id)
+        self.by_status.setdefault(status, set()).add(grievance_id)
+        statuses[row] = status
+
+    def remove(self, grievance_id):
+        row = self.index.pop(grievance_id, None)
+        if row is None:
+            return False
+        self.by_status[self.columns["status"][row]].discard(grievance_id)
+        for column in self.columns.values():
+            column[row] = column[-1]
+            column.pop()
+        if row < len(self):
+            self.index[self.columns["id"][row]] = row
+        return True
+
+    def record(self, op):
+        self.pending.append(op)
+        self.dirty = True
+
+    def flush(self):
+        if not self.dirty:
+            return
+        up_to_date = not self.is_stale()
+        with_storage(append_records, self.pending)
+        self.op_count += len(self.pending)
+        self.pending = []
+        self.dirty = False
+        if up_to_date:
+            self.mtime, self.size = file_state()
+
+    def compact(self):
+        self.load()
+        if self.op_count > COMPACT_RATIO * max(len(self), 1):
+            save_grievances(self.rows())
+            self.op_count = len(self)
+            self.mtime, self.size = file_state()
+
+
+def add_grievance(store, title, description, author):
+    store.load()
     title = title.strip()
     description = description.strip()
     author = author.strip()
     if not title or not description or not author:
         print("Error: Title, description, and author are required.")
         return
-    grievance = {
-        "id": generate_next_id(grievances),
-        "title": title,
-        "description": description,
-        "author": author,
-        "status": "open",
-        "upvotes": 0,
-        "downvotes": 0,
-        "created_at": datetime.now().isoformat(timespec="seconds"),
-    }
-    grievances.append(grievance)
-    save_grievances(grievances)
-    print(f"Added grievance #{grievance['id']}: {grievance['title']}")
-
-
-def list_grievances(status_filter=None, sort_key="date"):
-    grievances = load_grievances()
+    grievance = Grievance(
+        id=store.next_id,
+        title=title,
+        description=description,
+        author=author,
+        status="open",
+        upvotes=0,
+        downvotes=0,
+        score=0,
+        created_at=time.time_ns(),
+    )
+    store.add(grievance)
+    store.record({"op": "add", **grievance.to_dict()})
+    store.flush()
+    print(f"Added grievance #{grievance.id}: {grievance.title}")
+
+
+def iter_rows(store, status_filter=None):
+    if not status_filter:
+        yield from range(len(store))
+        return
+    index = store.index
+    for grievance_id in store.by_status.get(status_filter, ()):
+        yield index[grievance_id]
+
+
+def list_grievances(store, status_filter=None, sort_key="date", limit=LIST_LIMIT):
+    store.load()
+    columns = store.columns
+    ids = columns["id"]
+    scores = columns["score"]
     if status_filter:
-        grievances = [g for g in grievances if g.get("status") == status_filter]
+        total = len(store.by_status.get(status_filter, ()))
+    else:
+        total = len(store)
+    if limit is None:
+        limit = total
+    rows = iter_rows(store, status_filter)
     if sort_key == "votes":
-        grievances.sort(key=lambda g: (g.get("upvotes", 0) - g.get("downvotes", 0)), reverse=True)
+        rows = heapq.nlargest(limit, rows, key=lambda i: (scores[i], -ids[i]))
     else:
-        grievances.sort(key=lambda g: g.get("created_at", ""))
-    if not grievances:
+        created_at = columns["created_at"]
+        rows = heapq.nlargest(limit, rows, key=lambda i: (created_at[i], ids[i]))
+        rows.reverse()
+    if not rows:
         print("No grievances found.")
         return
-    for g in grievances:
-        score = g.get("upvotes", 0) - g.get("downvotes", 0)
-        print(
-            f"#{g['id']} | {g['status'].upper():8} | score: {score:+d} | "
-            f"{g['title']} (by {g['author']})"
+    statuses = columns["status"]
+    titles = columns["title"]
+    authors = columns["author"]
+    lines = []
+    append = lines.append
+    for i in rows:
+        append(
+            f"#{ids[i]} | {statuses[i].upper():8} | score: {scores[i]:+d} | "
+            f"{titles[i]} (by {authors[i]})"
         )
+    if total > len(rows):
+        append(f"(showing {len(rows)} of {total})")
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.write("\n")
 
 
-def show_grievance(grievance_id):
-    grievances = load_grievances()
-    grievance = find_grievance(grievances, grievance_id)
-    if not grievance:
+def show_grievance(store, grievance_id):
+    if store.is_stale() and not with_storage(file_contains_id, grievance_id):
+        print(f"Grievance #{grievance_id} not found.")
+        return
+    store.load()
+    row = store.index.get(grievance_id)
+    if row is None:
         print(f"Grievance #{grievance_id} not found.")
         return
-    print(f"ID: {grievance['id']}")
-    print(f"Title: {grievance['title']}")
-    print(f"Description: {grievance['description']}")
-    print(f"Author: {grievance['author']}")
-    print(f"Status: {grievance['status']}")
-    print(f"Upvotes: {grievance['upvotes']}")
-    print(f"Downvotes: {grievance['downvotes']}")
-    print(f"Created At: {grievance['created_at']}")
-
-
-def vote_grievance(grievance_id, vote_type):
-    grievances = load_grievances()
-    grievance = find_grievance(grievances, grievance_id)
-    if not grievance:
+    grievance = store.row(row)
+    print(f"ID: {grievance.id}")
+    print(f"Title: {grievance.title}")
+    print(f"Description: {grievance.description}")
+    print(f"Author: {grievance.author}")
+    print(f"Status: {grievance.status}")
+    print(f"Upvotes: {grievance.upvotes}")
+    print(f"Downvotes: {grievance.downvotes}")
+    print(f"Created At: {format_timestamp(grievance.created_at)}")
+
+
+def vote_grievance(store, grievance_id, vote_type):
+    store.load()
+    row = store.index.get(grievance_id)
+    if row is None:
         print(f"Grievance #{grievance_id} not found.")
         return
+    columns = store.columns
     if vote_type == "up":
-        grievance["upvotes"] = grievance.get("upvotes", 0) + 1
+        columns["upvotes"][row] += 1
+        columns["score"][row] += 1
     else:
-        grievance["downvotes"] = grievance.get("downvotes", 0) + 1
-    save_grievances(grievances)
+        columns["downvotes"][row] += 1
+        columns["score"][row] -= 1
+    store.record({"op": "vote", "id": grievance_id, "vote": vote_type})
+    store.flush()
     print(
         f"Voted {vote_type} on grievance #{grievance_id}. "
-        f"(up: {grievance['upvotes']}, down: {grievance['downvotes']})"
+        f"(up: {columns['upvotes'][row]}, down: {columns['downvotes'][row]})"
     )
 
 
-def resolve_grievance(grievance_id):
-    grievances = load_grievances()
-    grievance = find_grievance(grievances, grievance_id)
-    if not grievance:
+def resolve_grievance(store, grievance_id):
+    store.load()
+    row = store.index.get(grievance_id)
+    if row is None:
         print(f"Grievance #{grievance_id} not found.")
         return
-    grievance["status"] = "resolved"
-    save_grievances(grievances)
+    store.set_status(row, "resolved")
+    store.record({"op": "resolve", "id": grievance_id})
+    store.flush()
     print(f"Grievance #{grievance_id} marked as resolved.")
 
 
-def delete_grievance(grievance_id):
-    grievances = load_grievances()
-    original_len = len(grievances)
-    grievances = [g for g in grievances if g.get("id") != grievance_id]
-    if len(grievances) == original_len:
+def delete_grievance(store, grievance_id):
+    store.load()
+    if not store.remove(grievance_id):
         print(f"Grievance #{grievance_id} not found.")
         return
-    save_grievances(grievances)
+    store.record({"op": "delete", "id": grievance_id})
+    store.flush()
     print(f"Deleted grievance #{grievance_id}.")
 
 
+def export_grievances(store, path=EXPORT_FILE, pretty=True):
+    store.load()
+    grievances = [
+        {**g.to_dict(), "created_at": format_timestamp(g.created_at)}
+        for g in sorted(store.rows(), key=lambda g: g.id)
+    ]
+    with open(path, "wb", buffering=BUFFER_SIZE) as f:
+        f.write(json_dumps(grievances, pretty=pretty))
+        f.write(b"\n")
+    print(f"Exported {len(grievances)} grievances to {path}")
+
+
+MENU = """
+Student Grievance System - Menu
+1) Add grievance
+2) List grievances
+3) Show grievance by id
+4) Vote on grievance (up/down)
+5) Resolve grievance
+6) Delete grievance
+7) Export grievances to JSON
+0) Exit"""
+_STATUSES = frozenset(("open", "resolved"))
+_SORT_KEYS = frozenset(("date", "votes"))
+_VOTES = frozenset(("up", "down"))
+
+
+def _prompt_id():
+    try:
+        return int(input("Enter id: ").strip())
+    except ValueError:
+        print("Invalid id.")
+        return None
+
+
+def _handle_add(store):
+    title = input("Title: ").strip()
+    description = input("Description: ").strip()
+    author = input("Author: ").strip()
+    add_grievance(store, title, description, author)
+
+
+def _handle_list(store):
+    status = input("Filter by status (open/resolved or blank): ").strip()
+    status_val = status if status in _STATUSES else None
+    sort = input("Sort by (date/votes, default date): ").strip() or "date"
+    if sort not in _SORT_KEYS:
+        sort = "date"
+    list_grievances(store, status_val, sort)
+
+
+def _handle_show(store):
+    gid = _prompt_id()
+    if gid is not None:
+        show_grievance(store, gid)
+
+
+def _handle_vote(store):
+    gid = _prompt_id()
+    if gid is None:
+        return
+    vtype = input("Vote type (up/down): ").strip()
+    if vtype not in _VOTES:
+        print("Invalid vote type.")
+        return
+    vote_grievance(store, gid, vtype)
+
+
+def _handle_resolve(store):
+    gid = _prompt_id()
+    if gid is not None:
+        resolve_grievance(store, gid)
+
+
+def _handle_delete(store):
+    gid = _prompt_id()
+    if gid is not None:
+        delete_grievance(store, gid)
+
+
+_HANDLERS = {
+    "1": _handle_add,
+    "2": _handle_list,
+    "3": _handle_show,
+    "4": _handle_vote,
+    "5": _handle_resolve,
+    "6": _handle_delete,
+    "7": export_grievances,
+}
+
+
 def run_menu():
-    ensure_storage()
+    store = Store()
+    store.compact()
     while True:
-        print("\nStudent Grievance System - Menu")
-        print("1) Add grievance")
-        print("2) List grievances")
-        print("3) Show grievance by id")
-        print("4) Vote on grievance (up/down)")
-        print("5) Resolve grievance")
-        print("6) Delete grievance")
-        print("0) Exit")
-
+        print(MENU)
         choice = input("Choose an option: ").strip()
-
-        if choice == "1":
-            title = input("Title: ").strip()
-            description = input("Description: ").strip()
-            author = input("Author: ").strip()
-            add_grievance(title, description, author)
-
-        elif choice == "2":
-            status = input("Filter by status (open/resolved or blank): ").strip()
-            status_val = status if status in {"open", "resolved"} else None
-            sort = input("Sort by (date/votes, default date): ").strip() or "date"
-            if sort not in {"date", "votes"}:
-                sort = "date"
-            list_grievances(status_val, sort)
-
-        elif choice == "3":
-            try:
-                gid = int(input("Enter id: ").strip())
-            except ValueError:
-                print("Invalid id.")
-                continue
-            show_grievance(gid)
-
-        elif choice == "4":
-            try:
-                gid = int(input("Enter id: ").strip())
-            except ValueError:
-                print("Invalid id.")
-                continue
-            vtype = input("Vote type (up/down): ").strip()
-            if vtype not in {"up", "down"}:
-                print("Invalid vote type.")
-                continue
-            vote_grievance(gid, vtype)
-
-        elif choice == "5":
-            try:
-                gid = int(input("Enter id: ").strip())
-            except ValueError:
-                print("Invalid id.")
-                continue
-            resolve_grievance(gid)
-
-        elif choice == "6":
-            try:
-                gid = int(input("Enter id: ").strip())
-            except ValueError:
-                print("Invalid id.")
-                continue
-            delete_grievance(gid)
-
-        elif choice == "0":
+        if choice == "0":
             print("Goodbye!")
             break
-
+        handler = _HANDLERS.get(choice)
+        if handler:
+            handler(store)
         else:
             print("Please choose a valid option.")
 
 
-
 def main():
     run_menu()
 